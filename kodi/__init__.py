@@ -1,3 +1,4 @@
 """Kodi Package."""
 
+from .auth import Rejected, Unavailable
 from .kodi import Kodi
@@ -0,0 +1,199 @@
+"""Account authorization.
+"""
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import collections
+import json
+import logging
+import time
+
+try:
+    from urllib2 import HTTPError, Request, urlopen
+except ImportError:
+    from urllib.error import HTTPError
+    from urllib.request import Request, urlopen
+
+import boto3
+from botocore import config
+from botocore import exceptions
+
+
+LOG = logging.getLogger(__name__)
+
+
+IOT = boto3.client('iot', region_name='ap-southeast-2',
+                   config=config.Config(connect_timeout=1, read_timeout=2,
+                                        retries={'max_attempts': 1}))
+
+
+class Unavailable(Exception):
+
+    """Raised when ownership cannot be established because the profile or
+    device registry could not be reached.
+    """
+
+
+class Rejected(Exception):
+
+    """Raised when Login with Amazon rejects the account token."""
+
+
+class Profiles(object):
+
+    """Account token to Login with Amazon user id cache.
+
+    Access tokens rotate so each one is resolved once against the LWA profile
+    endpoint and kept for ``TTL`` seconds, the access token lifetime. Tokens
+    rejected by LWA are remembered for ``NEGATIVE_TTL`` seconds.
+
+    """
+
+    URL = 'https://api.amazon.com/user/profile'
+    TIMEOUT = 2
+    TTL = 3600
+    NEGATIVE_TTL = 60
+    MAX_TOKENS = 256
+    REJECTED = (400, 401, 403)
+
+    def __init__(self):
+        self._users = collections.OrderedDict()
+
+    def user_id(self, token):
+        """Return LWA user id for token.
+
+        Raises:
+            Rejected: If LWA rejected the token.
+            Unavailable: If LWA could not be reached.
+
+        """
+        now = time.time()
+        entry = self._users.get(token)
+        if entry is None or now >= entry[0]:
+            try:
+                user_id = self.resolve(token)
+            except HTTPError as error:
+                if error.code not in self.REJECTED:
+                    LOG.exception('failed to resolve profile')
+                    raise Unavailable('profile unavailable')
+                LOG.warning('profile rejected token: %d', error.code)
+                entry = (now + self.NEGATIVE_TTL, None)
+            except (IOError, ValueError):
+                LOG.exception('failed to resolve profile')
+                raise Unavailable('profile unavailable')
+            else:
+                if user_id is None:
+                    LOG.error('profile missing user_id')
+                    raise Unavailable('profile malformed')
+                entry = (now + self.TTL, user_id)
+
+        self._users.pop(token, None)
+        self._users[token] = entry
+        while len(self._users) > self.MAX_TOKENS:
+            self._users.popitem(last=False)
+
+        if entry[1] is None:
+            raise Rejected('token rejected')
+        return entry[1]
+
+    def resolve(self, token):
+        """Fetch LWA user id for token.
+
+        Raises:
+            IOError: If the profile request fails.
+            ValueError: If the profile response is malformed.
+
+        """
+        request = Request(self.URL,
+                          headers={'Authorization': 'Bearer %s' % token})
+        rsp = urlopen(request, timeout=self.TIMEOUT)
+        return json.loads(rsp.read().decode('utf-8')).get('user_id')
+
+
+class DeviceIndex(object):
+
+    """User id to Kodi Thing name index.
+
+    Built in bulk from the ``owner`` attribute of every Kodi Thing and served
+    from memory. The index is rebuilt when older than ``TTL`` seconds or when
+    asked about an unknown owner, no more than once every ``RETRY_INTERVAL``
+    seconds. Rebuilds run inline, as Lambda freezes work left running after
+    the handler returns, but give up after ``BUDGET`` seconds and keep the
+    previous index.
+
+    """
+
+    ATTRIBUTE = 'owner'
+    TTL = 300
+    RETRY_INTERVAL = 60
+    BUDGET = 2
+
+    def __init__(self):
+        self._things = None
+        self._updated = 0
+        self._attempted = 0
+
+    def refresh(self):
+        """Rebuild the index from the Kodi Thing registry.
+
+        Returns:
+            bool: True if rebuilt, False if the previous index was kept.
+
+        """
+        self._attempted = time.time()
+        deadline = self._attempted + self.BUDGET
+        things = {}
+        params = {'thingTypeName': 'Kodi', 'maxResults': 250}
+        try:
+            while True:
+                rsp = IOT.list_things(**params)
+                for thing in rsp.get('things', []):
+                    owner = thing.get('attributes', {}).get(self.ATTRIBUTE)
+                    if owner:
+                        things.setdefault(owner, set()).add(thing['thingName'])
+                if not rsp.get('nextToken'):
+                    break
+                if time.time() >= deadline:
+                    LOG.error('listing Kodi things exceeded %ds', self.BUDGET)
+                    return False
+                params['nextToken'] = rsp['nextToken']
+        except (exceptions.ClientError, exceptions.BotoCoreError):
+            LOG.exception('failed to list Kodi things')
+            return False
+        self._things = dict((owner, frozenset(names))
+                            for owner, names in things.items())
+        self._updated = time.time()
+        LOG.debug('indexed %d owners', len(self._things))
+        return True
+
+    def things(self, user_id):
+        """Return frozenset of Thing names owned by user_id.
+
+        Raises:
+            Unavailable: If no index could be built.
+
+        """
+        now = time.time()
+        retry = now - self._attempted >= self.RETRY_INTERVAL
+        if self._things is None:
+            if not retry or not self.refresh():
+                raise Unavailable('no Kodi device index')
+        elif retry and (user_id not in self._things or
+                        now - self._updated >= self.TTL):
+            self.refresh()
+        return self._things.get(user_id, frozenset())
+
+
+PROFILES = Profiles()
+INDEX = DeviceIndex()
+
+
+def devices(token):
+    """Return frozenset of Kodi Thing names owned by account token.
+
+    Raises:
+        Rejected: If the token was rejected.
+        Unavailable: If ownership cannot be established.
+
+    """
+    return INDEX.things(PROFILES.user_id(token))
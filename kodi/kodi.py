@@ -6,17 +6,14 @@
 import json
 import logging
 
-import boto3
-
+from . import auth
 from . import rpc
+from .state import REGISTRY
 
 
 LOG = logging.getLogger(__name__)
 
 
-IOT = boto3.client('iot', region_name='ap-southeast-2')
-
-
 class Kodi(object):
 
     """A Kodi device thing abstraction.
@@ -26,25 +23,38 @@ class Kodi(object):
 
     """
 
+    MOVIES = 'VideoLibrary.GetMovies'
+    TVSHOWS = 'VideoLibrary.GetTVShows'
+
     def __init__(self, thing):
         self._thing = thing
         self._rpc = rpc.Gateway()
+        self._state = REGISTRY.get(thing)
 
     @staticmethod
-    def find_devices(_token):
-        """Return a generator of Kodi's.
+    def find_devices(token):
+        """Return a generator of Kodi's owned by token.
 
-        TODO: handle pagination. Filter by token.
+        Raises:
+            auth.Rejected: If the token was rejected.
+            auth.Unavailable: If ownership cannot be established.
 
         """
-        rsp = IOT.list_things(thingTypeName='Kodi', maxResults=250)
-        for thing in rsp.get('things', []):
-            yield Kodi(thing['thingName'])
+        for thing in sorted(auth.devices(token)):
+            yield Kodi(thing)
 
     @classmethod
-    def from_endpoint(cls, endpoint):
-        """Return Kodi instance for endpoint.
+    def from_endpoint(cls, endpoint, token):
+        """Return Kodi instance for endpoint or None if token does not own it.
+
+        Raises:
+            auth.Rejected: If the token was rejected.
+            auth.Unavailable: If ownership cannot be established.
+
         """
+        if endpoint not in auth.devices(token):
+            LOG.warning('token not authorized for %s', endpoint)
+            return None
         return cls(endpoint)
 
     @property
@@ -151,48 +161,70 @@ class Kodi(object):
         rsp = self._rpc.command(self._thing, command)
         return rsp['movies'][0]['movieid'] if 'movies' in rsp else None
 
-    def search(self, titles):
+    def search(self, titles, methods=None):
         """Search Kodi Library for specified titles. Search includes both Movies
-        and TV shows.
+        and TV shows, stopping at the first library with a match.
 
         Args:
             titles (list): List of Movie titles.
+            methods (list): Library methods in order of preference, defaults
+                to Movies then TV shows.
 
         Returns:
             dict: Search RPC response.
 
         """
+        if methods is None:
+            methods = [self.MOVIES, self.TVSHOWS]
+        key = tuple(titles)
         titles = [{'operator': 'contains',
                    'field': 'title',
                    'value': title
                   } for title in titles]
-        methods = ['VideoLibrary.GetMovies', 'VideoLibrary.GetTVShows']
 
         rsp = {}
+        misses = []
         for method in methods:
-            command = {
-                'jsonrpc': '2.0',
-                'id': 1,
-                'params': {
-                    'limits': {
-                        'start': 0,
-                        'end': 1
-                    },
-                    'sort': {
-                        'order': 'ascending',
-                        'method': 'title',
-                        'ignorearticle': True
-                    },
-                    'filter': {
-                        'or': titles
-                    },
-                    'properties': ['title']
-                },
-                'method': method
-            }
-            rsp.update(self._rpc.command(self._thing, json.dumps(command)))
+            result = self._state.get_search((method, key))
+            cached = result is not None
+            if not cached:
+                result = self._search(method, titles)
+            rsp.update(result)
+            if 'movies' in result or 'tvshows' in result:
+                # only trust a miss once the title is known to be elsewhere
+                for miss, empty in misses:
+                    self._state.set_search((miss, key), empty)
+                if not cached:
+                    self._state.set_search((method, key), result)
+                break
+            elif result and not cached:
+                misses.append((method, result))
         return rsp
 
+    def _search(self, method, titles):
+        """Issue library search method for title filters."""
+        command = {
+            'jsonrpc': '2.0',
+            'id': 1,
+            'params': {
+                'limits': {
+                    'start': 0,
+                    'end': 1
+                },
+                'sort': {
+                    'order': 'ascending',
+                    'method': 'title',
+                    'ignorearticle': True
+                },
+                'filter': {
+                    'or': titles
+                },
+                'properties': ['title']
+            },
+            'method': method
+        }
+        return self._rpc.command(self._thing, json.dumps(command))
+
     def get_episode(self, tvshowid, season=None, episode=None):
         """Find the next unwatched episode for specified tv show id and optional
         season and episode.
@@ -0,0 +1,82 @@
+"""Warm container state.
+"""
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import collections
+import logging
+import time
+
+
+LOG = logging.getLogger(__name__)
+
+
+class ThingState(object):
+
+    """What has been learned about a single Kodi Thing.
+
+    Only library lookups are kept, they expire after ``LIBRARY_TTL`` seconds.
+    Player state is never cached as it changes from the Kodi UI without any
+    trace in the Thing's shadow.
+
+    Args:
+        thing (str): AWS IoT Kodi Thing name.
+
+    """
+
+    __slots__ = ('thing', 'searches')
+
+    LIBRARY_TTL = 600
+    MAX_SEARCHES = 16
+
+    def __init__(self, thing):
+        self.thing = thing
+        self.searches = collections.OrderedDict()
+
+    def get_search(self, key):
+        """Return cached library search result for key or None."""
+        entry = self.searches.get(key)
+        if entry is None:
+            return None
+        updated, result = entry
+        if time.time() - updated >= self.LIBRARY_TTL:
+            del self.searches[key]
+            return None
+        return result
+
+    def set_search(self, key, result):
+        """Cache library search result for key."""
+        self.searches.pop(key, None)
+        self.searches[key] = (time.time(), result)
+        while len(self.searches) > self.MAX_SEARCHES:
+            self.searches.popitem(last=False)
+
+
+class Registry(object):
+
+    """Bounded LRU registry of ThingState records.
+
+    Lives at module scope so it survives warm Lambda invocations.
+
+    Args:
+        capacity (int): Maximum number of Things tracked.
+
+    """
+
+    def __init__(self, capacity=64):
+        self._capacity = capacity
+        self._things = collections.OrderedDict()
+
+    def get(self, thing):
+        """Return ThingState for thing, creating it if required."""
+        state = self._things.pop(thing, None)
+        if state is None:
+            state = ThingState(thing)
+        self._things[thing] = state
+        while len(self._things) > self._capacity:
+            evicted, _ = self._things.popitem(last=False)
+            LOG.debug('evicted state for %s', evicted)
+        return state
+
+
+REGISTRY = Registry()
@@ -12,7 +12,6 @@ LOG = logging.getLogger(__name__)
 
 def lambda_handler(event, context):
     """Main Lambda Handler."""
-    print 'event ', event
     LOG.debug('event %s', event)
     namespace = event['directive']['header']['namespace']
     if namespace == 'Alexa.Discovery':
@@ -26,8 +25,9 @@ def lambda_handler(event, context):
 def handle_discovery(context, event):
     """Handle Device Discovery.
 
-    Need to ideally find device based on auth token. Need to investigate AWS
-    Cognito for managing this.
+    Devices are found by matching the auth token's Login with Amazon user id
+    against the ``owner`` attribute of each Kodi Thing. If ownership cannot be
+    established no endpoints are returned, as Alexa expects.
     """
     payload = {}
     header = {
@@ -39,6 +39,14 @@ def handle_discovery(context, event):
     token = event['directive']['payload']['scope']['token']
 
     if event['directive']['header']['name'] == 'Discover':
+        try:
+            devices = list(kodi.Kodi.find_devices(token))
+        except kodi.Rejected:
+            LOG.warning('discovery token rejected')
+            devices = []
+        except kodi.Unavailable:
+            LOG.error('unable to establish device ownership')
+            devices = []
         payload = {
             'endpoints': [
                 {
@@ -64,10 +72,10 @@ def handle_discovery(context, event):
                     'friendlyName': device.name,
                     'manufacturerName': 'OSMC'
                 }
-                for device in kodi.Kodi.find_devices(token)]
+                for device in devices]
         }
 
-        LOG.debug('found %d devices for %s', len(payload['endpoints']), token)
+        LOG.debug('found %d devices', len(payload['endpoints']))
         response = {
             'header': header,
             'payload': payload
@@ -79,7 +87,9 @@ def handle_remote_video_player(context, event):
     """Handle Request to Play Video on Kodi device."""
     payload = {}
     endpoint = event['directive']['endpoint']
-    device = kodi.Kodi.from_endpoint(endpoint['endpointId'])
+    device, error = get_device(event)
+    if device is None:
+        return error
 
     # build a video filter
     titles = []
@@ -96,7 +106,11 @@ def handle_remote_video_player(context, event):
         elif entity['type'] == 'Episode':
             episode = int(entity['value'])
 
-    results = device.search(titles)
+    # season or episode means a TV show so skip the movie library round trip
+    methods = [device.MOVIES, device.TVSHOWS]
+    if season is not None or episode is not None:
+        methods.reverse()
+    results = device.search(titles, methods)
 
     if 'movies' in results:
         device.play_movie(results['movies'][0]['movieid'])
@@ -130,7 +144,9 @@ def handle_playback_controller(context, event):
     """Handle Request Control Video on Kodi device."""
     payload = {}
     endpoint = event['directive']['endpoint']
-    device = kodi.Kodi.from_endpoint(endpoint['endpointId'])
+    device, error = get_device(event)
+    if device is None:
+        return error
 
     if event['directive']['header']['name'] == 'Stop':
         LOG.debug('Handling Stop directive')
@@ -171,3 +187,46 @@ def handle_playback_controller(context, event):
         'payload': payload
     }
     return {'event': response}
+
+
+def get_device(event):
+    """Return (device, None) for the directive's endpoint if owned by the
+    account or (None, ErrorResponse) otherwise.
+    """
+    endpoint = event['directive']['endpoint']
+    try:
+        device = kodi.Kodi.from_endpoint(endpoint['endpointId'],
+                                         endpoint['scope']['token'])
+    except kodi.Rejected:
+        return None, build_error(event, 'INVALID_AUTHORIZATION_CREDENTIAL',
+                                 'account token rejected')
+    except kodi.Unavailable:
+        LOG.error('unable to establish ownership of %s', endpoint['endpointId'])
+        return None, build_error(event, 'INTERNAL_ERROR',
+                                 'unable to establish endpoint ownership')
+    if device is None:
+        return None, build_error(event, 'NO_SUCH_ENDPOINT',
+                                 'endpoint not owned by this account')
+    return device, None
+
+
+def build_error(event, error_type, message):
+    """Build Alexa ErrorResponse for directive."""
+    header = {
+        'messageId': str(uuid.uuid1()),
+        'namespace': 'Alexa',
+        'name': 'ErrorResponse',
+        'payloadVersion': '3'
+    }
+    if 'correlationToken' in event['directive']['header']:
+        header['correlationToken'] = \
+            event['directive']['header']['correlationToken']
+    response = {
+        'header': header,
+        'endpoint': event['directive']['endpoint'],
+        'payload': {
+            'type': error_type,
+            'message': message
+        }
+    }
+    return {'event': response}
@@ -0,0 +1,160 @@
+"""Account authorization tests."""
+
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from botocore import exceptions
+
+from kodi import auth
+
+
+def thing(name, owner=None):
+    """Return list_things entry for name."""
+    return {'thingName': name,
+            'attributes': {'owner': owner} if owner else {}}
+
+
+THROTTLED = exceptions.ClientError(
+    {'Error': {'Code': 'ThrottlingException', 'Message': 'slow down'}},
+    'ListThings')
+
+
+class ProfilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.profiles = auth.Profiles()
+
+    def http_error(self, code):
+        """Return HTTPError with code from the profile endpoint."""
+        return auth.HTTPError(auth.Profiles.URL, code, 'error', {}, None)
+
+    def test_resolves_once_per_token(self):
+        with mock.patch.object(self.profiles, 'resolve',
+                               return_value='amzn1.account.1') as resolve:
+            self.assertEqual(self.profiles.user_id('tok'), 'amzn1.account.1')
+            self.assertEqual(self.profiles.user_id('tok'), 'amzn1.account.1')
+        resolve.assert_called_once_with('tok')
+
+    def test_rejected_token_negatively_cached(self):
+        with mock.patch.object(self.profiles, 'resolve',
+                               side_effect=self.http_error(401)) as resolve:
+            self.assertRaises(auth.Rejected, self.profiles.user_id, 'tok')
+            self.assertRaises(auth.Rejected, self.profiles.user_id, 'tok')
+        resolve.assert_called_once_with('tok')
+
+    def test_server_error_unavailable(self):
+        with mock.patch.object(self.profiles, 'resolve',
+                               side_effect=self.http_error(503)) as resolve:
+            self.assertRaises(auth.Unavailable, self.profiles.user_id, 'tok')
+            self.assertRaises(auth.Unavailable, self.profiles.user_id, 'tok')
+        self.assertEqual(resolve.call_count, 2)
+
+    def test_network_failure_unavailable(self):
+        with mock.patch.object(self.profiles, 'resolve',
+                               side_effect=IOError('down')) as resolve:
+            self.assertRaises(auth.Unavailable, self.profiles.user_id, 'tok')
+            self.assertRaises(auth.Unavailable, self.profiles.user_id, 'tok')
+        self.assertEqual(resolve.call_count, 2)
+
+    def test_lru_eviction(self):
+        self.profiles.MAX_TOKENS = 2
+        with mock.patch.object(self.profiles, 'resolve',
+                               side_effect=lambda token: 'id-' + token) as resolve:
+            self.profiles.user_id('a')
+            self.profiles.user_id('b')
+            self.profiles.user_id('a')  # b now least recently used
+            self.profiles.user_id('c')
+            self.profiles.user_id('a')
+            self.assertEqual(resolve.call_count, 3)
+            self.profiles.user_id('b')
+            self.assertEqual(resolve.call_count, 4)
+
+
+class DeviceIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = auth.DeviceIndex()
+        patcher = mock.patch.object(auth, 'IOT')
+        self.iot = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.iot.list_things.return_value = {
+            'things': [thing('lounge', 'u1'), thing('bedroom', 'u1'),
+                       thing('den', 'u2'), thing('spare')]}
+        self.now = 1000.0
+        patcher = mock.patch.object(auth.time, 'time', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_index_by_owner(self):
+        self.assertEqual(self.index.things('u1'),
+                         frozenset(['lounge', 'bedroom']))
+        self.assertEqual(self.index.things('u2'), frozenset(['den']))
+        self.assertEqual(self.iot.list_things.call_count, 1)
+
+    def test_pagination(self):
+        self.iot.list_things.side_effect = [
+            {'things': [thing('lounge', 'u1')], 'nextToken': 'page2'},
+            {'things': [thing('bedroom', 'u1')]}]
+        self.assertEqual(self.index.things('u1'),
+                         frozenset(['lounge', 'bedroom']))
+        self.assertEqual(self.iot.list_things.call_args_list[1][1]['nextToken'],
+                         'page2')
+
+    def test_pagination_budget(self):
+        def page(**_params):
+            self.now += auth.DeviceIndex.BUDGET
+            return {'things': [thing('lounge', 'u1')], 'nextToken': 'more'}
+        self.iot.list_things.side_effect = page
+        self.assertRaises(auth.Unavailable, self.index.things, 'u1')
+        self.assertEqual(self.iot.list_things.call_count, 1)
+
+    def test_stale_index_refreshed(self):
+        self.index.things('u1')
+        self.now += auth.DeviceIndex.TTL
+        self.iot.list_things.return_value = {'things': [thing('den', 'u1')]}
+        self.assertEqual(self.index.things('u1'), frozenset(['den']))
+        self.assertEqual(self.iot.list_things.call_count, 2)
+
+    def test_unknown_owner_negatively_cached(self):
+        self.index.things('u1')
+        self.now += auth.DeviceIndex.RETRY_INTERVAL
+        self.assertEqual(self.index.things('u3'), frozenset())
+        self.assertEqual(self.index.things('u3'), frozenset())
+        self.assertEqual(self.iot.list_things.call_count, 2)
+
+    def test_failure_keeps_previous_index(self):
+        self.index.things('u1')
+        self.now += auth.DeviceIndex.TTL
+        self.iot.list_things.side_effect = THROTTLED
+        self.assertEqual(self.index.things('u1'),
+                         frozenset(['lounge', 'bedroom']))
+        self.assertEqual(self.index.things('u1'),
+                         frozenset(['lounge', 'bedroom']))
+        self.assertEqual(self.iot.list_things.call_count, 2)
+
+    def test_no_index_unavailable(self):
+        self.iot.list_things.side_effect = THROTTLED
+        self.assertRaises(auth.Unavailable, self.index.things, 'u1')
+        self.assertRaises(auth.Unavailable, self.index.things, 'u1')
+        self.assertEqual(self.iot.list_things.call_count, 1)
+
+    def test_connection_failure_unavailable(self):
+        self.iot.list_things.side_effect = exceptions.EndpointConnectionError(
+            endpoint_url='https://iot.ap-southeast-2.amazonaws.com')
+        self.assertRaises(auth.Unavailable, self.index.things, 'u1')
+
+
+class DevicesTest(unittest.TestCase):
+
+    def test_rejected_token(self):
+        with mock.patch.object(auth.PROFILES, 'user_id',
+                               side_effect=auth.Rejected()):
+            self.assertRaises(auth.Rejected, auth.devices, 'tok')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""Kodi device tests."""
+
+import json
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from kodi import kodi, state
+
+
+class SearchTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(kodi, 'REGISTRY', state.Registry())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(kodi.rpc.Gateway, 'command')
+        self.command = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.command.side_effect = self.respond
+        self.methods = []
+
+    def respond(self, _thing, rpc, asynchronous=False):
+        """Record RPC method, only the TV show library has a match."""
+        method = json.loads(rpc)['method']
+        self.methods.append(method)
+        if method == kodi.Kodi.TVSHOWS:
+            return {'tvshows': [{'tvshowid': 7, 'title': 'Bluey'}]}
+        return {'limits': {'start': 0, 'end': 0, 'total': 0}}
+
+    def test_stops_at_first_match(self):
+        device = kodi.Kodi('lounge')
+        rsp = device.search(['Bluey'], [kodi.Kodi.TVSHOWS, kodi.Kodi.MOVIES])
+        self.assertEqual(rsp['tvshows'][0]['tvshowid'], 7)
+        self.assertEqual(self.methods, [kodi.Kodi.TVSHOWS])
+
+    def test_cache_shared_across_orders(self):
+        device = kodi.Kodi('lounge')
+        device.search(['Bluey'])
+        self.assertEqual(self.methods, [kodi.Kodi.MOVIES, kodi.Kodi.TVSHOWS])
+        del self.methods[:]
+        rsp = device.search(['Bluey'], [kodi.Kodi.TVSHOWS, kodi.Kodi.MOVIES])
+        self.assertEqual(rsp['tvshows'][0]['tvshowid'], 7)
+        self.assertEqual(self.methods, [])
+
+    def test_repeated_default_search_cached(self):
+        device = kodi.Kodi('lounge')
+        device.search(['Bluey'])
+        del self.methods[:]
+        rsp = device.search(['Bluey'])
+        self.assertEqual(rsp['tvshows'][0]['tvshowid'], 7)
+        self.assertEqual(self.methods, [])
+
+    def test_miss_cached_behind_cached_hit(self):
+        device = kodi.Kodi('lounge')
+        device.search(['Bluey'], [kodi.Kodi.TVSHOWS, kodi.Kodi.MOVIES])
+        device.search(['Bluey'])
+        del self.methods[:]
+        device.search(['Bluey'])
+        self.assertEqual(self.methods, [])
+
+    def test_miss_without_hit_not_cached(self):
+        device = kodi.Kodi('lounge')
+        device.search(['Nothing'], [kodi.Kodi.MOVIES])
+        device.search(['Nothing'], [kodi.Kodi.MOVIES])
+        self.assertEqual(self.methods, [kodi.Kodi.MOVIES] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+"""Lambda handler tests."""
+
+import json
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from botocore import exceptions
+
+import kodi
+import lambda_function
+
+
+def directive(namespace, name, payload=None):
+    """Return directive event for the lounge endpoint."""
+    return {
+        'directive': {
+            'header': {
+                'namespace': namespace,
+                'name': name,
+                'messageId': 'message',
+                'correlationToken': 'correlation',
+                'payloadVersion': '3'
+            },
+            'endpoint': {
+                'scope': {'type': 'BearerToken', 'token': 'tok'},
+                'endpointId': 'lounge'
+            },
+            'payload': payload or {}
+        }
+    }
+
+
+class AuthorizationTest(unittest.TestCase):
+
+    def test_endpoint_not_owned(self):
+        event = directive('Alexa.PlaybackController', 'Pause')
+        with mock.patch.object(kodi.auth, 'devices', return_value=frozenset()):
+            rsp = lambda_function.lambda_handler(event, None)
+        self.assertEqual(rsp['event']['header']['name'], 'ErrorResponse')
+        self.assertEqual(rsp['event']['payload']['type'], 'NO_SUCH_ENDPOINT')
+
+    def test_ownership_unavailable(self):
+        event = directive('Alexa.PlaybackController', 'Pause')
+        with mock.patch.object(kodi.auth, 'devices',
+                               side_effect=kodi.Unavailable()):
+            rsp = lambda_function.lambda_handler(event, None)
+        self.assertEqual(rsp['event']['payload']['type'], 'INTERNAL_ERROR')
+
+    def test_token_rejected(self):
+        event = directive('Alexa.PlaybackController', 'Pause')
+        with mock.patch.object(kodi.auth, 'devices',
+                               side_effect=kodi.Rejected()):
+            rsp = lambda_function.lambda_handler(event, None)
+        self.assertEqual(rsp['event']['payload']['type'],
+                         'INVALID_AUTHORIZATION_CREDENTIAL')
+
+    def test_registry_unreachable(self):
+        event = directive('Alexa.PlaybackController', 'Pause')
+        error = exceptions.EndpointConnectionError(
+            endpoint_url='https://iot.ap-southeast-2.amazonaws.com')
+        with mock.patch.object(kodi.auth, 'INDEX', kodi.auth.DeviceIndex()), \
+                mock.patch.object(kodi.auth.PROFILES, 'user_id',
+                                  return_value='u1'), \
+                mock.patch.object(kodi.auth.IOT, 'list_things',
+                                  side_effect=error):
+            rsp = lambda_function.lambda_handler(event, None)
+        self.assertEqual(rsp['event']['payload']['type'], 'INTERNAL_ERROR')
+
+    def test_discovery_unavailable(self):
+        event = {
+            'directive': {
+                'header': {
+                    'namespace': 'Alexa.Discovery',
+                    'name': 'Discover',
+                    'messageId': 'message',
+                    'payloadVersion': '3'
+                },
+                'payload': {
+                    'scope': {'type': 'BearerToken', 'token': 'tok'}
+                }
+            }
+        }
+        with mock.patch.object(kodi.auth, 'devices',
+                               side_effect=kodi.Unavailable()):
+            rsp = lambda_function.lambda_handler(event, None)
+        self.assertEqual(rsp['event']['payload']['endpoints'], [])
+
+
+class RemoteVideoPlayerTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(kodi.auth, 'devices',
+                                    return_value=frozenset(['lounge']))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(kodi.kodi, 'REGISTRY',
+                                    kodi.state.Registry())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(kodi.rpc.Gateway, 'command')
+        self.command = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.command.side_effect = self.respond
+        self.methods = []
+
+    def respond(self, _thing, rpc, asynchronous=False):
+        """Record RPC method and answer as a library holding one TV show."""
+        cmd = json.loads(rpc)
+        self.methods.append(cmd['method'])
+        if cmd['method'] == 'VideoLibrary.GetTVShows':
+            return {'tvshows': [{'tvshowid': 7, 'title': 'Bluey'}]}
+        if cmd['method'] == 'VideoLibrary.GetEpisodes':
+            return {'episodes': [{'episodeid': 42}]}
+        if cmd['method'] == 'Player.Open':
+            return cmd
+        return {}
+
+    def test_season_skips_movie_search(self):
+        event = directive('Alexa.RemoteVideoPlayer', 'SearchAndPlay', {
+            'entities': [
+                {'type': 'Video', 'value': 'Bluey'},
+                {'type': 'Season', 'value': '2'}
+            ]
+        })
+        lambda_function.lambda_handler(event, None)
+        self.assertEqual(self.methods, ['VideoLibrary.GetTVShows',
+                                        'VideoLibrary.GetEpisodes',
+                                        'Player.Open'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""Warm container state tests."""
+
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from kodi import state
+
+
+class ThingStateTest(unittest.TestCase):
+
+    def test_search_hit(self):
+        thing = state.ThingState('t1')
+        thing.set_search('key', {'movies': []})
+        self.assertEqual(thing.get_search('key'), {'movies': []})
+
+    def test_search_expires(self):
+        thing = state.ThingState('t1')
+        with mock.patch.object(state.time, 'time', return_value=1000):
+            thing.set_search('key', {'movies': []})
+        expired = 1000 + state.ThingState.LIBRARY_TTL
+        with mock.patch.object(state.time, 'time', return_value=expired):
+            self.assertIsNone(thing.get_search('key'))
+        self.assertNotIn('key', thing.searches)
+
+    def test_search_bounded(self):
+        thing = state.ThingState('t1')
+        for key in range(state.ThingState.MAX_SEARCHES + 1):
+            thing.set_search(key, {})
+        self.assertEqual(len(thing.searches), state.ThingState.MAX_SEARCHES)
+        self.assertIsNone(thing.get_search(0))
+
+
+class RegistryTest(unittest.TestCase):
+
+    def test_get_returns_same_state(self):
+        registry = state.Registry()
+        self.assertIs(registry.get('t1'), registry.get('t1'))
+
+    def test_lru_eviction(self):
+        registry = state.Registry(capacity=2)
+        first = registry.get('t1')
+        second = registry.get('t2')
+        registry.get('t1')  # t2 now least recently used
+        registry.get('t3')
+        self.assertIs(registry.get('t1'), first)
+        self.assertIsNot(registry.get('t2'), second)
+
+
+if __name__ == '__main__':
+    unittest.main()